@@ -5,6 +5,7 @@ CONFIG: dict[str, Any] = {
     "test_size": 0.2,  # Keep 20% of data as test
     "random_state": 42,  # Random state
     "outlier_threshold": 3,  # How many std away from mean that we consider, outliers
+    "numba_min_rows": 1_000_000,  # From this many rows, filter outliers with the numba kernel instead of numpy
     "required_cols": [
         "square_footage",
         "bedrooms",
@@ -4,6 +4,7 @@ from house_analysis.model import (
     save_model,
     load_model,
     get_model_formula,
+    LinearModel,
     ModelResult,
 )
 
@@ -37,6 +38,7 @@ __all__ = [
     "save_model",
     "load_model",
     "get_model_formula",
+    "LinearModel",
     "ModelResult",
     "ModelOperationError",
     "DataProcessingError",
@@ -1,15 +1,20 @@
 import os
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 from sklearn.model_selection import train_test_split  # type: ignore
-from sklearn.linear_model import LinearRegression  # type: ignore
-from sklearn.preprocessing import StandardScaler  # type: ignore
 
 from config import CONFIG
 from house_analysis.logging_config import logger
 from house_analysis.exceptions import DataProcessingError, ModelOperationError
 
+# Only import for type hint, since house_analysis.model imports this module
+if TYPE_CHECKING:
+    from house_analysis.model import LinearModel
+
 
 @dataclass
 class ModelData:
@@ -30,15 +35,41 @@ def load_data(filepath: str) -> pd.DataFrame:
     # Try open file
     try:
         logger.info(f"start loading data from {filepath}")
-        df: pd.DataFrame = pd.read_csv(filepath)
 
-        # Validation: check if all the required columns exits in the CSV file
-        missing_cols = set(CONFIG["required_cols"]).difference(df.columns)
+        # Validation: read only the first block to check if all the required columns exits in the CSV file.
+        # This must happen before the full read, otherwise include_columns would raise its own error first
+        with pacsv.open_csv(filepath) as reader:
+            missing_cols = set(CONFIG["required_cols"]).difference(reader.schema.names)
         if missing_cols:
             err = f"columns missing, required: {', '.join(missing_cols)}"
             logger.error(err)
             raise DataProcessingError(err)
 
+        # Only read the required columns, with explicit types so pyarrow can skip type inference
+        convert_options = pacsv.ConvertOptions(
+            include_columns=CONFIG["required_cols"],
+            column_types={col: pa.float64() for col in CONFIG["required_cols"]},
+        )
+        try:
+            table = pacsv.read_csv(filepath, convert_options=convert_options)
+        except pa.ArrowInvalid as e:
+            # Only a conversion error means some values are not numeric, any other error
+            # (e.g. a row with the wrong number of columns) would fail again, so raise it as is
+            if "conversion error" not in str(e):
+                raise
+
+            # Re-read the columns as plain strings instead of failing,
+            # so preprocess_data can coerce those values to NaN and drop their rows
+            logger.warning(f"typed read failed: {str(e)}, retrying as text")
+            convert_options = pacsv.ConvertOptions(
+                include_columns=CONFIG["required_cols"],
+                column_types={col: pa.string() for col in CONFIG["required_cols"]},
+            )
+            table = pacsv.read_csv(filepath, convert_options=convert_options)
+
+        # Convert to pandas, releasing the arrow buffers as we go to avoid holding two copies
+        df: pd.DataFrame = table.to_pandas(split_blocks=True, self_destruct=True)
+
         return df
     except Exception as e:
         err = f"error loading data: {str(e)}"
@@ -50,40 +81,61 @@ def load_data(filepath: str) -> pd.DataFrame:
 def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     logger.info("start preprocessing data")
 
-    # Copy data frame, so that even when we failed midway, it wouldn't corrupt the original data frame
-    processed_df: pd.DataFrame = df.copy()
+    cols = CONFIG["required_cols"]
+
+    # No upfront copy: assign and iloc below both return a new data frame,
+    # so the original data frame is never modified even when we failed midway
+    processed_df: pd.DataFrame = df
+
+    # Ensure data is numeric.
+    # load_data already enforces float columns, so only coerce (in a single call) when that's not the case
+    if not all(pd.api.types.is_numeric_dtype(processed_df[col]) for col in cols):
+        processed_df = processed_df.assign(
+            **processed_df[cols].apply(pd.to_numeric, errors="coerce")
+        )
 
-    # Ensure data is numeric
-    for col in CONFIG["required_cols"]:
-        processed_df[col] = pd.to_numeric(processed_df[col], errors="coerce")
+    # Work on a clean float ndarray from here, so the stats below are single numpy kernel calls
+    # instead of going through pandas' per-column NaN handling
+    arr = processed_df[cols].to_numpy(copy=False, dtype=np.float64)
 
-    # Handle missing data.
-    # Calling to isna().any() will check for each column, is there any missing values
-    # The second any() will check that, for all columns, is there any missing values
-    if processed_df[CONFIG["required_cols"]].isna().any().any():
+    # Handle missing data: a row is valid only if none of its columns is missing
+    keep = ~np.isnan(arr).any(axis=1)
+    if not keep.all():
         logger.warning("missing values, dropping row")
-        processed_df = processed_df.dropna(subset=CONFIG["required_cols"])
+        arr = arr[keep]
 
-    # Filter outliers: take any values that is too small or too large
-    for col in CONFIG["required_cols"]:
-        # Calculate mean
-        mean: float = processed_df[col].mean()
+    # Filter outliers: take any values that is too small or too large.
+    # Get threshold from config.
+    threshold = CONFIG["outlier_threshold"]
 
-        # Calculate standard deviation (std)
-        standard_deviation: float = processed_df[col].std()
+    if len(arr) >= CONFIG["numba_min_rows"]:
+        # For very large data sets, the JIT kernel pays off its compile cost.
+        # Import it here, so smaller data sets don't pay for loading numba either
+        from house_analysis.outlier_kernel import outlier_mask_numba
 
-        # Get threshold from config.
-        threshold = CONFIG["outlier_threshold"]
+        mask = outlier_mask_numba(arr, float(threshold))
+    else:
+        # Compute the mean and standard deviation (std) of every column in one pass over the feature matrix.
+        # With fewer than 2 rows, std is NaN and every row is dropped, so ignore the invalid/divide floating point errors
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = arr.mean(axis=0)
+            standard_deviation = arr.std(axis=0, ddof=1)
 
-        # Define the lower and upper bound of the valid data
-        lower_bound: float = mean - threshold * standard_deviation
-        upper_bound: float = mean + threshold * standard_deviation
+            # A row is kept only if all of its columns are within threshold * std away from the mean
+            mask = np.all(np.abs(arr - mean) <= threshold * standard_deviation, axis=1)
 
-        # Get the outlier set and drop them out of the data frame
-        outliers = (processed_df[col] < lower_bound) | (processed_df[col] > upper_bound)
-        if outliers.any():
-            logger.warning(f"found {outliers.sum()} outliers, drop data")
-            processed_df = processed_df[~outliers]
+    if not mask.all():
+        logger.warning(f"found {(~mask).sum()} outliers, drop data")
+    keep[keep] = mask
+
+    # Slice the data frame only once, for both missing values and outliers
+    if not keep.all():
+        processed_df = processed_df.iloc[keep]
+
+    # If data was already numeric and no row was dropped, we still hold the input data frame itself.
+    # Only copy in that case, so the caller never gets an alias of its input
+    if processed_df is df:
+        processed_df = df.copy()
 
     return processed_df
 
@@ -91,8 +143,9 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
 # Prepare data for model training
 def prepare_model_data(df: pd.DataFrame) -> ModelData:
     # Get X (features) and y (prediction).
-    X = df[CONFIG["feature_cols"]].to_numpy()
-    y = df[CONFIG["target_col"]].to_numpy()
+    # Use float32 to halve the bytes moved through every training/prediction step
+    X = df[CONFIG["feature_cols"]].to_numpy(dtype=np.float32)
+    y = df[CONFIG["target_col"]].to_numpy(dtype=np.float32)
 
     # Splitting the data set into trained set and test set
     X_trained: np.ndarray
@@ -120,15 +173,11 @@ def prepare_model_data(df: pd.DataFrame) -> ModelData:
 
 def make_predictions(
     df: pd.DataFrame,
-    model: LinearRegression,
-    scaler: StandardScaler,
+    model: "LinearModel",
 ) -> np.ndarray:
     try:
-        # Scale the feature columns
-        X_scaled = scaler.transform(df[CONFIG["required_cols"]].to_numpy())
-
-        # Predict using the scaled features
-        return model.predict(X_scaled)
+        # Predict using the raw feature columns, with the same float32 dtype as training
+        return model.predict(df[CONFIG["feature_cols"]].to_numpy(dtype=np.float32))
     except Exception as e:
         err = f"failed to make prediction: {str(e)}"
         logger.error(err)
@@ -1,13 +1,10 @@
-import json
 import os
-import pickle
 from dataclasses import dataclass
 from typing import Any, Dict, List, Tuple
 
+import joblib  # type: ignore
 import numpy as np
-from sklearn.linear_model import LinearRegression  # type: ignore
-from sklearn.metrics import r2_score, mean_squared_error  # type: ignore
-from sklearn.preprocessing import StandardScaler  # type: ignore
+import orjson
 
 from config import CONFIG
 from house_analysis.logging_config import logger
@@ -15,54 +12,75 @@ from house_analysis.exceptions import ModelOperationError
 from house_analysis.data_processing import ModelData
 
 
+@dataclass
+class LinearModel:
+    # Mirror the attribute names of sklearn's LinearRegression, so callers can use it the same way
+    coef_: np.ndarray
+    intercept_: float
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return X @ self.coef_ + self.intercept_
+
+
 @dataclass
 class ModelResult:
-    model: LinearRegression
-    scaler: StandardScaler
+    model: LinearModel
     train_predictions: np.ndarray
     test_predictions: np.ndarray
     train_r2: float
     test_r2: float
     train_rmse: float
     test_rmse: float
+    # Cached (intercept, coefficients), filled on the first call to get_model_formula
+    formula: Tuple[float, List[float]] | None = None
 
 
-def train_model(data: ModelData) -> Tuple[LinearRegression, StandardScaler]:
-    # Scale the feature set
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(data.X_trained)
+def train_model(data: ModelData) -> LinearModel:
+    # Solve the normal equation directly on the raw features.
+    # Augment the feature set with a column of 1s, so the last coefficient is the intercept.
+    # Solve in float64 even though the features are float32: the design matrix is only n x 3,
+    # and a single precision solve would leave rounding noise in the saved formula
+    A = np.column_stack([data.X_trained, np.ones(len(data.X_trained))]).astype(
+        np.float64, copy=False
+    )
+    beta, *_ = np.linalg.lstsq(A, data.y_trained.astype(np.float64), rcond=None)
 
-    # Train model with trained data set
-    model = LinearRegression()
-    model.fit(X_scaled, data.y_trained)
+    return LinearModel(coef_=beta[:-1], intercept_=float(beta[-1]))
 
-    return model, scaler
 
+# Calculate R2 and RMSE together, so the residuals are only computed once
+def _calculate_metrics(y: np.ndarray, y_pred: np.ndarray) -> Tuple[float, float]:
+    residuals = y - y_pred
 
-def evaluate_model(
-    data: ModelData,
-    model: LinearRegression,
-    scaler: StandardScaler,
-) -> ModelResult:
-    # Transform the feature sets
-    X_trained_scaled = scaler.transform(data.X_trained)
-    X_test_scaled = scaler.transform(data.X_test)
+    # Accumulate in float64, so the sums stay accurate even for float32 input
+    ss_res = float((residuals * residuals).sum(dtype=np.float64))
+    ss_tot = float(((y - y.mean(dtype=np.float64)) ** 2).sum(dtype=np.float64))
 
-    # Predict
-    trained_predictions = model.predict(X_trained_scaled)
-    test_predictions = model.predict(X_test_scaled)
+    # Follow sklearn's r2_score for the cases where R2 is not defined, instead of dividing by zero:
+    # NaN with less than 2 samples, and for a constant target 1.0 on a perfect fit, else 0.0
+    if len(y) < 2:
+        r2 = float("nan")
+    elif ss_tot == 0:
+        r2 = 1.0 if ss_res == 0 else 0.0
+    else:
+        r2 = 1 - ss_res / ss_tot
+
+    rmse = float(np.sqrt(ss_res / len(y)))
 
-    # Calculate R2 (coefficient of determination)
-    train_r2 = r2_score(data.y_trained, trained_predictions)
-    test_r2 = r2_score(data.y_test, test_predictions)
+    return r2, rmse
 
-    # Calculate RMSE (root square mean error)
-    train_rmse = np.sqrt(mean_squared_error(data.y_trained, trained_predictions))
-    test_rmse = np.sqrt(mean_squared_error(data.y_test, test_predictions))
+
+def evaluate_model(data: ModelData, model: LinearModel) -> ModelResult:
+    # Predict
+    trained_predictions = model.predict(data.X_trained)
+    test_predictions = model.predict(data.X_test)
+
+    # Calculate R2 (coefficient of determination) and RMSE (root square mean error)
+    train_r2, train_rmse = _calculate_metrics(data.y_trained, trained_predictions)
+    test_r2, test_rmse = _calculate_metrics(data.y_test, test_predictions)
 
     return ModelResult(
         model,
-        scaler,
         trained_predictions,
         test_predictions,
         train_r2,
@@ -83,31 +101,34 @@ def save_model(result: ModelResult, model_path: str, metadata_path: str) -> None
         if metadata_dir and not os.path.exists(metadata_dir):
             os.makedirs(metadata_dir)
 
-        # Save model and scaler
-        with open(model_path, "wb") as f:  # open file with write-binary permission
-            model_components = {
-                "model": result.model,
-                "scaler": result.scaler,
-            }
-            pickle.dump(model_components, f)
+        # Save model
+        model_components = {
+            "model": result.model,
+        }
+        joblib.dump(model_components, model_path, compress=3)
 
         # Save metadata
         intercept, coefficients = get_model_formula(result)
 
+        # orjson serializes numpy scalars/arrays natively, so no need to convert them to float first
         metadata = {
-            # "coefficients": coefficients,
-            "coefficients": [float(c) for c in coefficients],
-            "intercept": float(intercept),
+            "coefficients": coefficients,
+            "intercept": intercept,
             "feature": CONFIG["feature_cols"],
             "target": CONFIG["target_col"],
-            "train_r2": float(result.train_r2),
-            "test_r2": float(result.test_r2),
-            "train_rmse": float(result.train_rmse),
-            "test_rmse": float(result.test_rmse),
+            "train_r2": result.train_r2,
+            "test_r2": result.test_r2,
+            "train_rmse": result.train_rmse,
+            "test_rmse": result.test_rmse,
         }
 
-        with open(metadata_path, "w") as f:
-            json.dump(metadata, f, indent=4)
+        with open(metadata_path, "wb") as f:
+            f.write(
+                orjson.dumps(
+                    metadata,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+                )
+            )
 
     except Exception as e:
         err = f"error saving model: {str(e)}"
@@ -120,31 +141,23 @@ def get_model_formula(result: ModelResult) -> Tuple[float, List[float]]:
     # Since this is multi linear regression, its formula should be:
     # y = a1x1 + a2x2 + ... + anxn + b
     # So coefficient would be a list, while intercept, can be sum up into a single number
-    model = result.model
-    scaler = result.scaler
-
-    # Assert that scale_ and mean_ are not None (they're set after fit_transform)
-    assert scaler.scale_ is not None, "Scaler must be fitted"
-    assert scaler.mean_ is not None, "Scaler must be fitted"
-
-    # Calculate coefficients
-    coefficients: List[float] = []
-    for i in range(len(model.coef_)):
-        # We need to divide to the scaler since we normalize the feature set when training
-        coefficients.append(model.coef_[i] / scaler.scale_[i])
-
-    # Calculate intercept
-    intercept = float(model.intercept_) - sum(
-        model.coef_[i] * scaler.mean_ / scaler.scale_
-    )
+    # Formula is used in several places (save, print, visualization), so only compute it once
+    if result.formula is None:
+        # Since the model is trained on the raw (unscaled) features, its coefficients can be used directly
+        model = result.model
+
+        coefficients: List[float] = model.coef_.tolist()
+        intercept = float(model.intercept_)
+
+        result.formula = (intercept, coefficients)
 
-    return intercept, coefficients
+    return result.formula
 
 
 def load_model(
     model_path: str,
     metadata_path: str,
-) -> Tuple[LinearRegression, StandardScaler, Dict[str, Any]]:
+) -> Tuple[LinearModel, Dict[str, Any]]:
     try:
         # Load model data
         if not os.path.isfile(model_path):
@@ -152,11 +165,9 @@ def load_model(
             logger.error(err)
             raise ModelOperationError(err)
 
-        with open(model_path, "rb") as f:  # read file as binary permission
-            model_components = pickle.load(f)
+        model_components = joblib.load(model_path)
 
         model = model_components["model"]
-        scaler = model_components["scaler"]
 
         # Load metedata
         metadata = {}
@@ -166,10 +177,10 @@ def load_model(
             logger.error(err)
             raise ModelOperationError(err)
 
-        with open(metadata_path, "r") as f:
-            metadata = json.load(f)
+        with open(metadata_path, "rb") as f:
+            metadata = orjson.loads(f.read())
 
-        return model, scaler, metadata
+        return model, metadata
     except Exception as e:
         err = f"failed to load model: {str(e)}"
         logger.error(err)
@@ -0,0 +1,32 @@
+import numpy as np
+from numba import njit, prange  # type: ignore
+
+
+# Compute the outlier mask with a JIT-compiled kernel, used for very large data sets.
+# Mean and std are computed with Welford's algorithm (one streaming pass per column, in parallel),
+# then the rows are checked in parallel with another pass
+@njit(parallel=True, cache=True, error_model="numpy")
+def outlier_mask_numba(arr: np.ndarray, threshold: float) -> np.ndarray:
+    n, d = arr.shape
+    mean = np.empty(d)
+    standard_deviation = np.empty(d)
+
+    for j in prange(d):
+        m = 0.0
+        m2 = 0.0
+        for i in range(n):
+            delta = arr[i, j] - m
+            m += delta / (i + 1)
+            m2 += delta * (arr[i, j] - m)
+        mean[j] = m
+        standard_deviation[j] = np.sqrt(m2 / (n - 1))  # same as ddof=1
+
+    mask = np.ones(n, dtype=np.bool_)
+    for i in prange(n):
+        for j in range(d):
+            # Written as "not <=" so that a NaN std also marks the row as an outlier
+            if not abs(arr[i, j] - mean[j]) <= threshold * standard_deviation[j]:
+                mask[i] = False
+                break
+
+    return mask
@@ -1,12 +1,26 @@
 import pandas as pd
 import numpy as np
-
-import matplotlib.pyplot as plt
 from typing import Dict, Any
 
-from config import CONFIG
-from house_analysis.data_processing import ModelData
-from house_analysis.model import ModelResult, get_model_formula
+import matplotlib
+
+# Force the non-interactive backend before pyplot is imported, since we only save plots to file
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+from config import CONFIG  # noqa: E402
+from house_analysis.data_processing import ModelData  # noqa: E402
+from house_analysis.model import ModelResult, get_model_formula  # noqa: E402
+
+
+# Convert float32 values to float64 for display.
+# A plain astype would print float32 noise (e.g. 575.3 -> 575.299988), so go through
+# numpy's shortest string form of each value, which gives back the value as written in the CSV
+def _to_display_float(arr: np.ndarray) -> np.ndarray:
+    if arr.dtype == np.float32:
+        return arr.astype(str).astype(np.float64)
+    return arr.astype(np.float64)
 
 
 def print_result(data: ModelData, result: ModelResult) -> None:
@@ -24,50 +38,63 @@ def print_result(data: ModelData, result: ModelResult) -> None:
         f"rmse result: {result.train_rmse:.4f} (trained) | {result.test_rmse:.4f} (test)"
     )
 
-    # Print some sample data set (both trained and test)
+    # Print some sample data set (both trained and test).
+    # Slice the arrays first, so we only build data frames for the rows we display
+    sample_size = 5
     trained_sample = pd.DataFrame(
         {
-            "Square footage": data.X_trained[
-                :, 0
-            ],  # Get all row of column 0 (square_footage)
-            "Bedrooms": data.X_trained[:, 1],  # Get all row of column 1 (bedrooms)
-            "Actual price ($K)": data.y_trained,
-            "Predicted price ($K)": np.round(result.train_predictions, 2),
+            "Square footage": _to_display_float(
+                data.X_trained[:sample_size, 0]
+            ),  # Get first rows of column 0 (square_footage)
+            "Bedrooms": _to_display_float(
+                data.X_trained[:sample_size, 1]
+            ),  # Get first rows of column 1 (bedrooms)
+            "Actual price ($K)": _to_display_float(data.y_trained[:sample_size]),
+            "Predicted price ($K)": np.round(
+                _to_display_float(result.train_predictions[:sample_size]), 2
+            ),
         }
     )
 
     test_sample = pd.DataFrame(
         {
-            "Square footage": data.X_test[:, 0],
-            "Bedrooms": data.X_test[:, 1],
-            "Actual price ($K)": data.y_test,
-            "Predicted price ($K)": np.round(result.test_predictions, 2),
+            "Square footage": _to_display_float(data.X_test[:sample_size, 0]),
+            "Bedrooms": _to_display_float(data.X_test[:sample_size, 1]),
+            "Actual price ($K)": _to_display_float(data.y_test[:sample_size]),
+            "Predicted price ($K)": np.round(
+                _to_display_float(result.test_predictions[:sample_size]), 2
+            ),
         }
     )
 
     print("training sample data")
-    print(f"{trained_sample.head(5).to_string(index=False)}")
+    print(f"{trained_sample.to_string(index=False)}")
 
     print("test data sample")
-    print(f"{test_sample.head(5).to_string(index=False)}")
+    print(f"{test_sample.to_string(index=False)}")
 
 
 def create_visualization_data(data: ModelData, result: ModelResult) -> Dict[str, Any]:
-    # Combine both train and test sample to get the value range for features
-    X_combined = np.vstack((data.X_trained, data.X_test))
+    # Get the value range for features over both train and test sample.
+    # Reduce each set separately and combine the results, instead of stacking them into a new array
+    feature_min = np.minimum(data.X_trained.min(axis=0), data.X_test.min(axis=0))
+    feature_max = np.maximum(data.X_trained.max(axis=0), data.X_test.max(axis=0))
 
     # For square_footage column
-    x_min, x_max = X_combined[:, 0].min(), X_combined[:, 0].max()
+    x_min, x_max = feature_min[0], feature_max[0]
 
     # For bedrooms column
-    y_min, y_max = X_combined[:, 1].min(), X_combined[:, 1].max()
+    y_min, y_max = feature_min[1], feature_max[1]
 
     # Create the feature range with step = 100
     feature_ranges = [np.linspace(x_min, x_max, 100), np.linspace(y_min, y_max, 100)]
 
     # Calculate feature mean for regression line/plane
     # Since we have 2 features here, we basically will create 2 plots, where 1 feature is variable (vary) and 1 is constant
-    feature_mean = X_combined.mean(axis=0)
+    feature_mean = (
+        data.X_trained.sum(axis=0, dtype=np.float64)
+        + data.X_test.sum(axis=0, dtype=np.float64)
+    ) / (len(data.X_trained) + len(data.X_test))
 
     # Get formula for displaying
     intercept, coefficients = get_model_formula(result)
@@ -78,15 +105,8 @@ def create_visualization_data(data: ModelData, result: ModelResult) -> Dict[str,
     y_range = np.linspace(y_min, y_max, CONFIG["mesh_grid_size"])
     xx, yy = np.meshgrid(x_range, y_range)
 
-    # Prepare grid point for predictions
-    grid_points = np.c_[xx.ravel(), yy.ravel()]
-
-    # Scale grid point using the same scaler
-    grid_points_scaled = result.scaler.transform(grid_points)
-
-    # Make predictions
-    z_pred = result.model.predict(grid_points_scaled)
-    zz = z_pred.reshape(xx.shape)
+    # Make predictions: for a linear model, evaluate the formula directly on the grid
+    zz = intercept + coefficients[0] * xx + coefficients[1] * yy
 
     return {
         "feature_ranges": feature_ranges,
@@ -104,8 +124,12 @@ def create_2d_visualization(
     vis_data: Dict[str, Any],
     output: str,
 ) -> None:
+    # Get formula to compute the regression lines
+    intercept, coefficients = get_model_formula(model_result)
+
     # Create a figure with 2 side-by-side plots (1 row, 2 cols), one for each feature
-    _, axes = plt.subplots(1, 2, figsize=CONFIG["figure_size"])
+    fig = plt.figure(figsize=CONFIG["figure_size"])
+    axes = fig.subplots(1, 2)
 
     # Create plot for each feature
     for i, feature in enumerate(CONFIG["feature_cols"]):
@@ -130,22 +154,14 @@ def create_2d_visualization(
         )
 
         # Add regresion line
+        # The current feature varies, while the other feature is kept constant at its mean
         feature_ranges = vis_data["feature_ranges"]
         feature_mean = vis_data["feature_mean"]
-        if i == 0:  # If feature is square_footage
-            line_x = np.c_[
-                feature_ranges[0],
-                np.full(feature_ranges[0].shape, feature_mean[1]),
-            ]
-        else:  # If feature is bedroom
-            line_x = np.c_[
-                np.full(feature_ranges[1].shape, feature_mean[0]),
-                feature_ranges[1],
-            ]
-
-        # Scale the line point and predict price
-        line_x_scaled = model_result.scaler.transform(line_x)
-        line_y = model_result.model.predict(line_x_scaled)
+        line_y = (
+            intercept
+            + coefficients[i] * feature_ranges[i]
+            + coefficients[1 - i] * feature_mean[1 - i]
+        )
 
         # Plot the regression line
         ax.plot(
@@ -166,10 +182,10 @@ def create_2d_visualization(
         ax.grid(True, alpha=CONFIG["alpha"])
 
     # Add overall title
-    plt.suptitle("Multi linear regression: housing price vs features")
-    plt.tight_layout(rect=(0.0, 0.0, 1.0, 0.95))
-    plt.savefig(output)
-    plt.close()
+    fig.suptitle("Multi linear regression: housing price vs features")
+    fig.tight_layout(rect=(0.0, 0.0, 1.0, 0.95))
+    fig.savefig(output)
+    plt.close(fig)
 
 
 def create_3d_visualization(
@@ -221,8 +237,8 @@ def create_3d_visualization(
     ax.legend()
 
     # Add formula as text
-    plt.figtext(0.1, 0.01, vis_data["formula_text"], fontsize=12)
+    fig.text(0.1, 0.01, vis_data["formula_text"], fontsize=12)
 
     # Save plot
-    plt.savefig(output, bbox_inches="tight")
-    plt.close()
+    fig.savefig(output, bbox_inches="tight")
+    plt.close(fig)
@@ -1,6 +1,7 @@
 import argparse
 import sys
 import traceback
+from concurrent.futures import ProcessPoolExecutor
 from config import CONFIG
 from house_analysis.data_processing import (
     load_data,
@@ -32,9 +33,9 @@ def parse_arguments() -> argparse.Namespace:
     )
 
     parser.add_argument(
-        "--no-plot",
+        "--plot",
         action="store_true",
-        help="not creating visualization when running",
+        help="create visualization when running (off by default, since plotting dominates runtime; replaces --no-plot)",
     )
 
     parser.add_argument(
@@ -80,7 +81,7 @@ def main() -> int:
         # Choose action based on command line arguments
         if args.load_model:
             # Load model and metadata from file
-            model, scaler, _ = load_model(args.model_path, args.metadata_path)
+            model, _ = load_model(args.model_path, args.metadata_path)
             logger.info("model load success")
 
         # If not load pretrained model, then we assume that we want to train a new one
@@ -91,10 +92,10 @@ def main() -> int:
             data = prepare_model_data(processed_df)
 
             # Train model
-            model, scaler = train_model(data)
+            model = train_model(data)
 
             # Evaludate model
-            result = evaluate_model(data, model, scaler)
+            result = evaluate_model(data, model)
 
             # Print the result into the terminal
             print_result(data, result)
@@ -104,18 +105,29 @@ def main() -> int:
                 save_model(result, args.model_path, args.metadata_path)
 
             # If want to create visualization
-            if not args.no_plot:
+            if args.plot:
                 vis_data = create_visualization_data(data, result)
 
-                # Create 2D visualization
+                # Both visualizations are independent and CPU-bound, so render them in parallel.
+                # Each process creates its own figure, since a figure cannot be shared across processes
                 output_2d = CONFIG["output_image"]
-                logger.info(f"create 2D visualization at: {output_2d}")
-                create_2d_visualization(data, result, vis_data, output_2d)
-
-                # Create 3D visualization
                 output_3d = CONFIG["output_image_3d"]
-                logger.info(f"create 3D visualization at: {output_3d}")
-                create_3d_visualization(data, vis_data, output_3d)
+                with ProcessPoolExecutor(max_workers=2) as executor:
+                    # Create 2D visualization
+                    logger.info(f"create 2D visualization at: {output_2d}")
+                    future_2d = executor.submit(
+                        create_2d_visualization, data, result, vis_data, output_2d
+                    )
+
+                    # Create 3D visualization
+                    logger.info(f"create 3D visualization at: {output_3d}")
+                    future_3d = executor.submit(
+                        create_3d_visualization, data, vis_data, output_3d
+                    )
+
+                    # Wait for both, re-raising any error from the worker process
+                    future_2d.result()
+                    future_3d.result()
 
         return 0
     except DataProcessingError as e: